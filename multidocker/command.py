@@ -8,6 +8,7 @@ from subprocess import run, PIPE
 from multidocker.app import is_an_app, open_app
 from multidocker.app import combine as combine_apps
 from multidocker.app import add_namespace as namespace_app
+from multidocker.stats import stats
 
 
 MULTIDOCKER_MODE = None
@@ -28,13 +29,23 @@ def multidocker_mode():
     return MULTIDOCKER_MODE
 
 
+def load_apps():
+    """
+    RETURNS:
+        list of tuples
+        - str: name of the app
+        - dict: namespaced app
+    """
+    apps = [ open_app(directory) for directory in listdir() if is_an_app(directory) ]
+
+    return [ (app_name, namespace_app((app_name, app))) for app_name, app in apps ]
+
+
 def load_compose_file():
 
     if multidocker_mode():
 
-        apps = [ open_app(directory) for directory in listdir() if is_an_app(directory) ]
-
-        namespaced_apps = [ namespace_app(app) for app in apps ]
+        namespaced_apps = [ app for _, app in load_apps() ]
 
         return yaml.dump(combine_apps(namespaced_apps), encoding='utf-8', default_flow_style=False)
 
@@ -55,6 +66,10 @@ def single_run():
     We consider ourselves in single run mode when we were started with arguments.
     e.g. `multidocker ps` instead of `multidocker`
     """
+    if sys.argv[1] == 'stats':
+        run_stats(sys.argv[2:])
+        return
+
     compose_file = load_compose_file()
 
     command = get_external_command()
@@ -63,6 +78,27 @@ def single_run():
     run(command, input=compose_file)
 
 
+def run_stats(args):
+    """
+    `multidocker stats [interval]`
+    """
+    if not multidocker_mode():
+        print("'stats' is only available in multidocker mode")
+        return
+
+    try:
+        interval = float(args[0]) if args and args[0] else 2.0
+    except ValueError:
+        interval = None
+
+    # this also rejects nan, which compares false to everything
+    if interval is None or not 0 < interval < float('inf'):
+        print(f"'{args[0]}' is not a valid interval, expected a positive number of seconds")
+        return
+
+    stats(load_apps(), interval)
+
+
 def get_command_input():
     # TODO: add readline support
     input_string = input('multidocker> ')
@@ -75,7 +111,7 @@ def write_composefile(compose_file):
 
 
 VALID_SUBCOMMANDS = None
-VALID_MULTIDOCKER_COMMANDS = ['cat', 'exit', 'help', 'reload', 'write', 'quit']
+VALID_MULTIDOCKER_COMMANDS = ['cat', 'exit', 'help', 'reload', 'stats', 'write', 'quit']
 def is_valid_dockercommand(subcommand):
     global VALID_SUBCOMMANDS
 
@@ -119,6 +155,9 @@ def interactive_run():
             elif subcommand == 'reload':
                 compose_file = load_compose_file()
 
+            elif subcommand == 'stats':
+                run_stats(input_parts[1:])
+
             elif subcommand in ['exit', 'quit']:
                 return
 
@@ -181,6 +220,7 @@ Multidocker Commands:
   cat                Output combined compose file to disk
   help               Show this help text
   reload             Reload the compose files from disk
+  stats [interval]   Show cpu, memory and io usage per app (ctrl+c to stop)
   write              Write the combined compsose file to disk
   quit, exit         Exit interactive mode (ctrl+d also works)
 """
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+from os import path
+from time import monotonic, sleep
+from subprocess import run, PIPE
+
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+# where docker puts a container's cgroup, for the systemd and cgroupfs drivers
+CGROUP_PATTERNS = ['system.slice/docker-{}.scope', 'docker/{}']
+
+
+def container_apps(namespaced_apps):
+    """
+    Map every container of the combined project to the app it came from
+
+    EXPECTS:
+        namespaced_apps: list of tuples
+        - str: name of the app
+        - dict: app namespaced by `app.add_namespace`
+
+    RETURNS:
+        dict: container name -> app name
+
+    EXAMPLES:
+    >>> apps = [('proxy', {'services': {'proxy_nginx': {'container_name': 'proxy_nginx'}}}),
+    ...         ('cloud', {'services': {'cloud_db': {'container_name': 'db'}}})]
+    >>> container_apps(apps)
+    {'proxy_nginx': 'proxy', 'db': 'cloud'}
+    """
+    return {
+        svc.get('container_name', svc_name): app_name
+        for app_name, app in namespaced_apps
+        for svc_name, svc in app['services'].items()
+    }
+
+
+def get_container_ids(container_names):
+    """
+    Get the full ids of the running containers in container_names,
+    with a single `docker ps` call
+
+    RETURNS:
+        dict: container name -> container id
+    """
+    # TODO: upgrade to python 3.7 to replace `PIPE` and `.stdout` with `text=True`
+    ps_output = run(['docker', 'ps', '--no-trunc', '--format', '{{.Names}} {{.ID}}'],
+                    encoding='utf-8', stdout=PIPE).stdout
+
+    return parse_container_ids(ps_output, container_names)
+
+
+def parse_container_ids(ps_output, container_names):
+    """
+    >>> parse_container_ids("proxy_nginx abc\\nother def\\n", ['proxy_nginx', 'gone'])
+    {'proxy_nginx': 'abc'}
+    """
+    ids = dict(line.split(' ', 1) for line in ps_output.splitlines() if ' ' in line)
+    return { name: ids[name] for name in container_names if name in ids }
+
+
+def find_cgroup_dirs(apps, cgroup_root=CGROUP_ROOT):
+    """
+    EXPECTS:
+        apps       : dict: container name -> app name, from `container_apps`
+        cgroup_root: mountpoint of the cgroup v2 hierarchy
+
+    RETURNS:
+        dict: cgroup directory -> app name, for every running container
+    """
+    cgroup_dirs = { find_cgroup_dir(container_id, cgroup_root): apps[name]
+                    for name, container_id in get_container_ids(apps).items() }
+    cgroup_dirs.pop(None, None)
+
+    return cgroup_dirs
+
+
+def find_cgroup_dir(container_id, cgroup_root=CGROUP_ROOT):
+    """
+    EXPECTS:
+        container_id: full id of a container
+        cgroup_root : mountpoint of the cgroup v2 hierarchy
+
+    RETURNS:
+        str: the container's cgroup directory
+        or None if it could not be found
+    """
+    for pattern in CGROUP_PATTERNS:
+        cgroup_dir = path.join(cgroup_root, pattern.format(container_id))
+        if path.isdir(cgroup_dir):
+            return cgroup_dir
+
+    return None
+
+
+def parse_keyed(text):
+    """
+    Parse a flat keyed cgroup file like `cpu.stat`
+
+    >>> parse_keyed("usage_usec 1500\\nuser_usec 1000\\n")
+    {'usage_usec': 1500, 'user_usec': 1000}
+    """
+    return { key: int(value) for key, value in (line.split() for line in text.splitlines() if line) }
+
+
+def parse_io_stat(text):
+    """
+    Sum the read and written bytes over all devices in `io.stat`
+
+    >>> parse_io_stat("8:0 rbytes=100 wbytes=20 rios=1 wios=1\\n8:16 rbytes=5 wbytes=0 rios=1 wios=0\\n")
+    (105, 20)
+    """
+    rbytes = wbytes = 0
+    for line in text.splitlines():
+        fields = dict(field.split('=') for field in line.split()[1:])
+        rbytes += int(fields.get('rbytes', 0))
+        wbytes += int(fields.get('wbytes', 0))
+
+    return (rbytes, wbytes)
+
+
+def read_counters(cgroup_dir):
+    """
+    Read the raw cpu, memory and io counters of a cgroup
+
+    A cgroup without the io controller has no `io.stat`,
+    in that case we report 0 bytes read and written
+
+    RETURNS:
+        dict: counters
+        or None if the cgroup disappeared (e.g. the container stopped)
+    """
+    try:
+        with open(path.join(cgroup_dir, 'cpu.stat')) as f:
+            cpu_usec = parse_keyed(f.read())['usage_usec']
+        with open(path.join(cgroup_dir, 'memory.current')) as f:
+            memory = int(f.read())
+    # a cgroup removed while we read it gives ENODEV instead of ENOENT
+    except OSError:
+        return None
+
+    try:
+        with open(path.join(cgroup_dir, 'io.stat')) as f:
+            (rbytes, wbytes) = parse_io_stat(f.read())
+    except OSError:
+        if not path.isdir(cgroup_dir):
+            return None
+        (rbytes, wbytes) = (0, 0)
+
+    return {'cpu_usec': cpu_usec, 'memory': memory, 'rbytes': rbytes, 'wbytes': wbytes}
+
+
+def sample(cgroup_dirs):
+    """
+    Read the counters of all containers in one pass
+
+    We key the counters by cgroup directory instead of container name,
+    so a recreated container is never compared against its predecessor
+
+    EXPECTS:
+        cgroup_dirs: iterable of cgroup directories
+
+    RETURNS:
+        a tuple
+        - float: time of the sample
+        - dict: cgroup directory -> counters
+    """
+    counters = { cgroup_dir: read_counters(cgroup_dir) for cgroup_dir in cgroup_dirs }
+    return (monotonic(), { d: c for d, c in counters.items() if c is not None },)
+
+
+def compute_rates(previous, current):
+    """
+    Turn two samples into per container rates
+
+    Containers that are missing from either sample are left out,
+    as are containers whose counters went down (e.g. after `docker restart`)
+
+    >>> before = (10.0, {'a': {'cpu_usec': 0, 'memory': 10, 'rbytes': 0, 'wbytes': 0}})
+    >>> after = (12.0, {'a': {'cpu_usec': 1000000, 'memory': 20, 'rbytes': 400, 'wbytes': 200}})
+    >>> compute_rates(before, after)
+    {'a': {'cpu_percent': 50.0, 'memory': 20, 'read_bps': 200.0, 'write_bps': 100.0}}
+
+    >>> restarted = (14.0, {'a': {'cpu_usec': 500, 'memory': 5, 'rbytes': 0, 'wbytes': 0}})
+    >>> compute_rates(after, restarted)
+    {}
+    """
+    (prev_time, prev_counters) = previous
+    (cur_time, cur_counters) = current
+    elapsed = cur_time - prev_time
+
+    rates = {}
+    for key, cur in cur_counters.items():
+        prev = prev_counters.get(key)
+
+        if prev is None or any(cur[c] < prev[c] for c in ['cpu_usec', 'rbytes', 'wbytes']):
+            continue
+
+        rates[key] = {
+            'cpu_percent': (cur['cpu_usec'] - prev['cpu_usec']) / (elapsed * 10000),
+            'memory': cur['memory'],
+            'read_bps': (cur['rbytes'] - prev['rbytes']) / elapsed,
+            'write_bps': (cur['wbytes'] - prev['wbytes']) / elapsed,
+        }
+
+    return rates
+
+
+def aggregate_per_app(rates, apps):
+    """
+    Sum container rates per app
+
+    EXPECTS:
+        rates: dict: cgroup directory -> rates, from `compute_rates`
+        apps : dict: cgroup directory -> app name, from `find_cgroup_dirs`
+
+    >>> rates = {'a_1': {'cpu_percent': 1.0, 'memory': 2, 'read_bps': 3.0, 'write_bps': 4.0},
+    ...          'a_2': {'cpu_percent': 1.0, 'memory': 2, 'read_bps': 3.0, 'write_bps': 4.0}}
+    >>> aggregate_per_app(rates, {'a_1': 'a', 'a_2': 'a'})
+    {'a': {'cpu_percent': 2.0, 'memory': 4, 'read_bps': 6.0, 'write_bps': 8.0}}
+    """
+    totals = {}
+    for cgroup_dir, container_rates in rates.items():
+        app_totals = totals.setdefault(apps[cgroup_dir], dict.fromkeys(container_rates, 0))
+        for key, value in container_rates.items():
+            app_totals[key] += value
+
+    return totals
+
+
+def human_bytes(n):
+    """
+    >>> human_bytes(512)
+    '512.0B'
+    >>> human_bytes(3 * 1024 * 1024)
+    '3.0MiB'
+    """
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if n < 1024:
+            break
+        n /= 1024
+
+    return f"{n:.1f}{unit}"
+
+
+def format_stats(app_stats):
+    lines = [f"{'APP':<24}{'CPU %':>8}{'MEM':>12}{'READ/s':>12}{'WRITE/s':>12}"]
+    for app_name, s in sorted(app_stats.items()):
+        lines.append(f"{app_name:<24}{s['cpu_percent']:>8.1f}{human_bytes(s['memory']):>12}"
+                     f"{human_bytes(s['read_bps']):>12}{human_bytes(s['write_bps']):>12}")
+
+    return "\n".join(lines)
+
+
+def stats(namespaced_apps, interval=2.0, cgroup_root=CGROUP_ROOT):
+    """
+    Print per app cpu, memory and io usage every `interval` seconds until ctrl+c
+
+    We look the containers up again on every interval,
+    so containers that are (re)created or stopped are picked up
+
+    Instead of going through `docker stats` we read the counters
+    straight from the cgroup v2 hierarchy, which is a lot cheaper
+    """
+    apps = container_apps(namespaced_apps)
+    no_containers = f"no running containers found under {cgroup_root} (is cgroup v2 in use?)"
+
+    cgroup_dirs = find_cgroup_dirs(apps, cgroup_root)
+    if not cgroup_dirs:
+        print(no_containers)
+        return
+
+    try:
+        previous = sample(cgroup_dirs)
+        while True:
+            sleep(interval)
+            cgroup_dirs = find_cgroup_dirs(apps, cgroup_root)
+            current = sample(cgroup_dirs)
+
+            if current[1]:
+                print(format_stats(aggregate_per_app(compute_rates(previous, current), cgroup_dirs)) + "\n")
+            else:
+                print(no_containers)
+
+            previous = current
+
+    except KeyboardInterrupt:
+        return
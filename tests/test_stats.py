@@ -0,0 +1,101 @@
+import shutil
+
+from multidocker import stats as stats_module
+from multidocker.command import run_stats
+from multidocker.stats import find_cgroup_dir, read_counters, sample, compute_rates, aggregate_per_app, stats
+
+
+def write_cgroup(cgroup_dir, usage_usec, memory, rbytes, wbytes, io=True):
+    cgroup_dir.mkdir(parents=True, exist_ok=True)
+    (cgroup_dir / 'cpu.stat').write_text(f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n")
+    (cgroup_dir / 'memory.current').write_text(f"{memory}\n")
+    if io:
+        (cgroup_dir / 'io.stat').write_text(f"8:0 rbytes={rbytes} wbytes={wbytes} rios=0 wios=0 dbytes=0 dios=0\n")
+
+
+def test_find_cgroup_dir(tmp_path):
+    (tmp_path / 'system.slice' / 'docker-abc.scope').mkdir(parents=True)
+    (tmp_path / 'docker' / 'def').mkdir(parents=True)
+
+    assert find_cgroup_dir('abc', str(tmp_path)) == str(tmp_path / 'system.slice' / 'docker-abc.scope')
+    assert find_cgroup_dir('def', str(tmp_path)) == str(tmp_path / 'docker' / 'def')
+    assert find_cgroup_dir('missing', str(tmp_path)) is None
+
+
+def test_read_counters_of_stopped_container(tmp_path):
+    assert read_counters(str(tmp_path / 'gone')) is None
+
+
+def test_read_counters_without_io_controller(tmp_path):
+    write_cgroup(tmp_path, 1500, 100, 0, 0, io=False)
+
+    assert read_counters(str(tmp_path)) == {'cpu_usec': 1500, 'memory': 100, 'rbytes': 0, 'wbytes': 0}
+
+
+def test_rates_per_app(tmp_path):
+    nginx = tmp_path / 'docker' / 'nginx'
+    letsencrypt = tmp_path / 'docker' / 'letsencrypt'
+    db = tmp_path / 'docker' / 'db'
+    cgroup_dirs = {str(nginx): 'proxy', str(letsencrypt): 'proxy', str(db): 'cloud'}
+
+    write_cgroup(nginx, 0, 100, 0, 0)
+    write_cgroup(letsencrypt, 0, 50, 0, 0)
+    write_cgroup(db, 0, 1000, 0, 0)
+    (_, before) = sample(cgroup_dirs)
+
+    write_cgroup(nginx, 500000, 200, 1000, 0)
+    write_cgroup(letsencrypt, 500000, 50, 0, 1000)
+    write_cgroup(db, 250000, 1000, 4000, 2000)
+    (_, after) = sample(cgroup_dirs)
+
+    app_stats = aggregate_per_app(compute_rates((0.0, before), (1.0, after)), cgroup_dirs)
+
+    assert app_stats == {
+        'proxy': {'cpu_percent': 100.0, 'memory': 250, 'read_bps': 1000.0, 'write_bps': 1000.0},
+        'cloud': {'cpu_percent': 25.0, 'memory': 1000, 'read_bps': 4000.0, 'write_bps': 2000.0},
+    }
+
+
+def test_stats_follows_recreated_containers(tmp_path, monkeypatch, capsys):
+    namespaced_apps = [
+        ('proxy', {'services': {'proxy_nginx': {'container_name': 'proxy_nginx'}}}),
+        ('cloud', {'services': {'cloud_db': {'container_name': 'cloud_db'}}}),
+    ]
+    container_ids = {'proxy_nginx': 'nginx1', 'cloud_db': 'db1'}
+    write_cgroup(tmp_path / 'docker' / 'nginx1', 0, 1024, 0, 0)
+    write_cgroup(tmp_path / 'docker' / 'db1', 0, 2048, 0, 0)
+
+    def fake_sleep(interval):
+        fake_sleep.calls += 1
+        if fake_sleep.calls == 1:
+            # nginx keeps running, the db gets recreated with a new id
+            write_cgroup(tmp_path / 'docker' / 'nginx1', 100000, 1024, 0, 0)
+            shutil.rmtree(tmp_path / 'docker' / 'db1')
+            write_cgroup(tmp_path / 'docker' / 'db2', 0, 4096, 0, 0)
+            container_ids['cloud_db'] = 'db2'
+        elif fake_sleep.calls == 2:
+            write_cgroup(tmp_path / 'docker' / 'db2', 200000, 4096, 0, 0)
+        else:
+            raise KeyboardInterrupt()
+    fake_sleep.calls = 0
+
+    monkeypatch.setattr(stats_module, 'get_container_ids', lambda apps: dict(container_ids))
+    monkeypatch.setattr(stats_module, 'sleep', fake_sleep)
+    monkeypatch.setattr(stats_module, 'monotonic', lambda: float(fake_sleep.calls))
+
+    stats(namespaced_apps, 1.0, str(tmp_path))
+
+    (first, second) = capsys.readouterr().out.strip().split("\n\n")
+    assert first.splitlines()[1:] == ["proxy                       10.0      1.0KiB        0.0B        0.0B"]
+    assert second.splitlines()[1:] == [
+        "cloud                       20.0      4.0KiB        0.0B        0.0B",
+        "proxy                        0.0      1.0KiB        0.0B        0.0B",
+    ]
+
+
+def test_run_stats_rejects_bad_intervals(monkeypatch, capsys):
+    monkeypatch.setattr('multidocker.command.multidocker_mode', lambda: True)
+
+    for interval in ['abc', '-1', '0', 'nan', 'inf']:
+        run_stats([interval])
+        assert f"'{interval}' is not a valid interval" in capsys.readouterr().out